@@ -1,5 +1,7 @@
-from parsy import regex, generate, alt, string, seq, Parser, Result
+from parsy import regex, generate, alt, string, seq, Parser, Result, ParseError
 import operator
+import os
+import re
 
 # Grammar
 #
@@ -29,35 +31,373 @@ import operator
 # number := (0|[1-9][0-9]*)([.,][0-9]+)?([eE][+-]?[0-9]+)?
 
 
+# Kinds stored in ParserProperties.token_table
+TOKEN_TO = 'TO'
+TOKEN_SEP = 'DSEP'
+TOKEN_CUR = 'CUR'
+
+
 class ParserProperties(object):
 
+    default_cur_in = 'USD'
+    default_curs_out = ['USD', 'EUR']
     to_keywords = ['to', 'in', ':']
     sep_keywords = [',', '&', 'and']
+    aliases = {}
+    token_table = None
 
     def __init__(self):
         pass
 
+    def validate(self):
+        """Return the names of the fields that cannot be used to build a parser."""
+        def is_word(value):
+            return isinstance(value, str) and len(value) > 0
+
+        def is_word_list(value):
+            return isinstance(value, (list, tuple)) and all(is_word(item) for item in value)
+
+        invalid = []
+        if not is_word(self.default_cur_in):
+            invalid.append('default_cur_in')
+        if not is_word_list(self.default_curs_out):
+            invalid.append('default_curs_out')
+        if not is_word_list(self.to_keywords):
+            invalid.append('to_keywords')
+        if not is_word_list(self.sep_keywords):
+            invalid.append('sep_keywords')
+        if not isinstance(self.aliases, dict) or \
+                not all(is_word(alias) and is_word(code) for alias, code in self.aliases.items()):
+            invalid.append('aliases')
+        return invalid
+
+
+def make_token_table(to_keywords, sep_keywords, aliases):
+    """Map every keyword and alias to its kind in a single lookup table.
+
+    Aliases map to (TOKEN_CUR, code). Keywords are added last so that they
+    stay reserved even if an alias shares their spelling.
+    """
+    token_table = {alias: (TOKEN_CUR, code) for alias, code in aliases.items()}
+    token_table.update({keyword: TOKEN_SEP for keyword in sep_keywords})
+    token_table.update({keyword: TOKEN_TO for keyword in to_keywords})
+    return token_table
+
+
+NUMBER_REGEX = r'(0|[1-9][0-9]*)([.,][0-9]+)?([eE][+-]?[0-9]+)?'
+MATH_SYMBOLS = '+-/*^(),&:'
+WORD_CHAR = re.compile(r'\w')
+
+ADD_OPERATORS = {'+': operator.add, '-': operator.sub}
+MULT_OPERATORS = {'*': operator.mul, '/': operator.truediv}
+EXP_OPERATORS = {'^': operator.pow, '**': operator.pow}
+EXTRA_OPERATORS = {'+': operator.add,
+                   '-': operator.sub,
+                   '**': operator.pow,
+                   '*': operator.mul,
+                   '/': operator.truediv,
+                   '^': operator.pow}
+
+
+def keyword_regex(keywords):
+    """Compile a keyword list into one anchored pattern that also eats trailing whitespace.
+
+    Longer keywords are tried first, and keywords ending in a word character
+    may not be followed by another one, so 'in' does not match the start of
+    'inr' and 'and' does not match the start of 'andorra'.
+    """
+    alternatives = []
+    for keyword in sorted(keywords, key=len, reverse=True):
+        if keyword:
+            alternative = re.escape(keyword)
+            if WORD_CHAR.match(keyword[-1]):
+                alternative += r'(?!\w)'
+            alternatives.append(alternative)
+    return re.compile('(?:{})\\s*'.format('|'.join(alternatives) or '(?!)'))
+
 
 def make_parser(properties):
+    """Build the query parser described by the grammar above.
+
+    The hand-written QueryParser is used by default; setting the
+    CURRENCYPP_LEGACY_PARSER environment variable selects the original
+    parsy implementation instead.
+    """
+    if os.environ.get('CURRENCYPP_LEGACY_PARSER'):
+        return make_legacy_parser(properties)
+    return QueryParser(properties)
+
+
+class QueryParser(object):
+    """Recursive-descent parser for the query grammar.
+
+    Mirrors make_legacy_parser rule for rule (including its ordered-choice
+    backtracking), but works on string indices directly instead of going
+    through parser combinators. The parser only holds configuration; every
+    parse() call scans with its own _QueryScan, so one instance can be shared.
+    """
+
+    def __init__(self, properties):
+        self.to_keywords = list(properties.to_keywords)
+        self.sep_keywords = list(properties.sep_keywords)
+        self.token_table = properties.token_table
+        if self.token_table is None:
+            self.token_table = make_token_table(
+                self.to_keywords, self.sep_keywords, properties.aliases)
+        self.to_keyword = keyword_regex(self.to_keywords)
+        self.sep_keyword = keyword_regex(self.sep_keywords)
+
+    def parse(self, stream):
+        """Parse the whole string and return the query dict or raise a ParseError."""
+        result = _QueryScan(self, stream).query(0)
+        if result is None:
+            raise ParseError('query', stream, 0)
+        value, index = result
+        if index < len(stream):
+            raise ParseError('EOF', stream, index)
+        return value
+
+
+class _QueryScan(object):
+    """State of a single QueryParser.parse() call.
+
+    Each rule takes the current index and returns a (value, next_index)
+    tuple, or None when it does not match.
+    """
+
+    _number = re.compile(NUMBER_REGEX)
+
+    def __init__(self, parser, stream):
+        self.token_table = parser.token_table
+        self._to_keyword = parser.to_keyword
+        self._sep_keyword = parser.sep_keyword
+        self._stream = stream
+        self._end = len(stream)
+
+    def _skip_whitespace(self, index):
+        stream = self._stream
+        while index < self._end and stream[index].isspace():
+            index += 1
+        return index
+
+    def _symbol(self, index, symbol):
+        if self._stream.startswith(symbol, index):
+            return self._skip_whitespace(index + len(symbol))
+        return None
+
+    def _operator(self, index, operators):
+        for symbol in operators:
+            next_index = self._symbol(index, symbol)
+            if next_index is not None:
+                return symbol, next_index
+        return None
+
+    def _keyword(self, index, pattern):
+        match = pattern.match(self._stream, index)
+        return match.end() if match else None
+
+    def _code(self, index):
+        stream = self._stream
+        start = index
+        while index < self._end:
+            item = stream[index]
+            if item.isdigit() or item.isspace() or item in MATH_SYMBOLS:
+                break
+            index += 1
+        else:
+            if index == start:
+                return None
+            return self._resolve_alias(stream[start:index]), index
+
+        word = stream[start:index]
+        if not word:
+            return None
+        kind = self.token_table.get(word)
+        if kind == TOKEN_TO or kind == TOKEN_SEP:
+            return None
+        return self._resolve_alias(word), self._skip_whitespace(index)
+
+    def _resolve_alias(self, word):
+        kind = self.token_table.get(word.upper())
+        if isinstance(kind, tuple) and kind[0] == TOKEN_CUR:
+            return kind[1]
+        return word
+
+    def _number_literal(self, index):
+        match = self._number.match(self._stream, index)
+        if not match:
+            return None
+        value = float(match.group(0).replace(',', '.'))
+        return value, self._skip_whitespace(match.end())
+
+    def _left_binary(self, index, operators, operand):
+        result = operand(index)
+        if result is None:
+            return None
+        value, index = result
+        while True:
+            op = self._operator(index, operators)
+            if op is None:
+                break
+            symbol, next_index = op
+            right = operand(next_index)
+            if right is None:
+                break
+            value = operators[symbol](value, right[0])
+            index = right[1]
+        return value, index
+
+    def _expression(self, index):
+        return self._left_binary(index, ADD_OPERATORS, self._mult_expr)
+
+    def _mult_expr(self, index):
+        return self._left_binary(index, MULT_OPERATORS, self._exp_expr)
+
+    def _exp_expr(self, index):
+        return self._left_binary(index, EXP_OPERATORS, self._unary_expr)
+
+    def _unary_expr(self, index):
+        result = self._operand(index)
+        if result is not None:
+            return result
+        op = self._operator(index, ('-', '+'))
+        if op is None:
+            return None
+        symbol, index = op
+        result = self._unary_expr(index)
+        if result is None:
+            return None
+        value, index = result
+        return (-value if symbol == '-' else value), index
+
+    def _operand(self, index):
+        result = self._number_literal(index)
+        if result is not None:
+            return result
+        return self._parenthesized(index, self._expression)
+
+    def _parenthesized(self, index, rule):
+        index = self._symbol(index, '(')
+        if index is None:
+            return None
+        result = rule(index)
+        if result is None:
+            return None
+        value, index = result
+        index = self._symbol(index, ')')
+        if index is None:
+            return None
+        return value, index
+
+    def _source(self, index):
+        # amount first: expression followed by an optional currency code
+        result = self._expression(index)
+        if result is not None:
+            amount, index = result
+            code = self._code(index)
+            if code is None:
+                return {'amount': amount, 'currency': None}, index
+            return {'amount': amount, 'currency': code[0]}, code[1]
+
+        # currency first: currency code followed by an optional expression
+        code = self._code(index)
+        if code is not None:
+            currency, index = code
+            result = self._expression(index)
+            if result is None:
+                return {'amount': None, 'currency': currency}, index
+            return {'amount': result[0], 'currency': currency}, result[1]
+
+        return self._parenthesized(index, self._source)
+
+    def _sources(self, index):
+        result = self._source(index)
+        if result is None:
+            return None
+        first, index = result
+        index = self._skip_whitespace(index)
+
+        op = self._operator(index, ('+', '-'))
+        if op is not None:
+            symbol, next_index = op
+            rest = self._sources(next_index)
+            if rest is not None:
+                rest, index = rest
+                if symbol == '-':
+                    rest[0]['amount'] *= -1
+                return [first] + rest, index
+        return [first], index
+
+    def _destinations(self, index):
+        code = self._code(index)
+        if code is None:
+            return None
+        first, index = code
+        destinations = [{'currency': first}]
+
+        next_index = self._keyword(index, self._sep_keyword)
+        if next_index is not None:
+            rest = self._destinations(next_index)
+            if rest is not None:
+                rest, index = rest
+                destinations += rest
+        return destinations, index
+
+    def _extra(self, index):
+        op = self._operator(index, EXTRA_OPERATORS)
+        if op is None:
+            return None
+        symbol, index = op
+        result = self._expression(index)
+        if result is None:
+            return None
+        value, index = result
+        return {'operation': EXTRA_OPERATORS[symbol], 'value': value}, index
+
+    def query(self, index):
+        result = self._sources(index)
+        if result is None:
+            return None
+        sources, index = result
+
+        # a matched separator is not given back if no destination follows it
+        destinations = None
+        to_index = self._keyword(index, self._to_keyword)
+        result = self._destinations(index if to_index is None else to_index)
+        if result is not None:
+            destinations, index = result
+
+        result = self._extra(index)
+        if result is not None:
+            extras, index = result
+            op = extras['operation']
+            value = extras['value']
+            for source in sources:
+                source['amount'] = op(source['amount'], value)
+
+        return {
+            'sources': sources,
+            'destinations': destinations
+        }, index
+
+
+def make_legacy_parser(properties):
     whitespace = regex(r'\s*')
     def lexeme(p): return p << whitespace
 
     def s(p): return lexeme(string(p))
-    numberRegex = r'(0|[1-9][0-9]*)([.,][0-9]+)?([eE][+-]?[0-9]+)?'
-    number = lexeme(regex(numberRegex)
+    number = lexeme(regex(NUMBER_REGEX)
                     .map(lambda x: x.replace(',', '.'))
                     .map(float).desc('a number'))
 
     lparen = lexeme(string('('))
     rparen = lexeme(string(')'))
 
-    math_symbols = '+-/*^(),&:'
-
     def to_parser():
-        return alt(*[s(keyword) for keyword in properties.to_keywords])
+        return regex(keyword_regex(properties.to_keywords))
 
     def sep_parser():
-        return alt(*[s(keyword) for keyword in properties.sep_keywords])
+        return regex(keyword_regex(properties.sep_keywords))
 
     @generate
     def code():
@@ -67,7 +407,7 @@ def make_parser(properties):
             word = ''
             while index < len(stream):
                 item = stream[index]
-                if item.isdigit() or item.isspace() or item in math_symbols:
+                if item.isdigit() or item.isspace() or item in MATH_SYMBOLS:
                     break
                 word += item
                 index += 1
@@ -1,32 +1,66 @@
 from exchange import ExchangeRates, UpdateFreq, CurrencyError
-from flox.utils import cache_path
 from parsy import ParseError
-from currencyparser import make_parser, ParserProperties
+from currencyparser import make_parser, make_token_table, ParserProperties
 from flox import Flox, clipboard
+from functools import lru_cache
+from pathlib import Path
+from tempfile import gettempdir
+import os
+import re
+
+
+_NUMBER_START_CHARS = frozenset('0123456789.-+')
+_NUMBER_CHARS = frozenset('0123456789.,-+eE _')
+_ALIAS_LINE = re.compile(r'^([^=\n]*)=(.*)', re.MULTILINE)
+
+
+@lru_cache(maxsize=8)
+def _build_parser(cur_in, curs_out, separators, dest_separators, aliases):
+    """Build (or reuse) a parser for one configuration; all arguments must be hashable."""
+    properties = ParserProperties()
+    properties.default_cur_in = cur_in
+    properties.default_curs_out = list(curs_out)
+    properties.to_keywords = list(separators)
+    properties.sep_keywords = list(dest_separators)
+    properties.aliases = dict(aliases)
+    properties.token_table = make_token_table(
+        properties.to_keywords, properties.sep_keywords, properties.aliases)
+    return make_parser(properties)
 
 
 class CurrencyPP(Flox):
 
     broker = None
+    _settings_mtime = None
+    _config_snapshot = None
+
+    # Shared query skeletons, rebuilt by _read_config; never mutated in place
+    _default_sources = ({'currency': 'USD', 'amount': 1.0},)
+    _default_destinations = ({'currency': 'EUR'},)
 
     def __init__(self):
         """Initialize the CurrencyPP plugin."""
         super().__init__()
         self.logger_level("debug")
         self.logger.debug("=== CurrencyPP Plugin Initializing ===")
-        self._read_config()
+        self._read_config(self._get_settings_mtime())
 
     def query(self, user_input):
         """Process a currency conversion query from the user."""
         self.logger.debug(f"Processing query: '{user_input}'")
         
         try:
-            # Validate query format
-            if not self._is_direct_request(self._parse_and_merge_input(user_input, True)):
+            # Skip the parser for one- or two-letter words that cannot be a currency
+            if (user_input.isalpha() and len(user_input) < 3 and
+                    user_input.upper() not in self.broker.aliases and
+                    user_input.upper() not in self.broker.currencies):
+                return
+
+            # Parse once, then validate query format and content
+            query, is_direct = self._parse_and_merge_input(user_input)
+            if not is_direct:
                 return
             
-            # Parse and validate query content
-            query = self._parse_and_merge_input(user_input)
             if not query or query.get('destinations') is None or query.get('sources') is None:
                 return
                 
@@ -40,13 +74,16 @@ class CurrencyPP(Flox):
                 
             # Perform conversion and show results
             results = self.broker.convert(query)
+            add_item = self.add_item
+            action = self.item_action
             for result in results:
-                self.add_item(
+                desc = result['description']
+                add_item(
                     result['title'],
-                    result['description'],
-                    context=result['description'],
-                    method=self.item_action,
-                    parameters=[result['amount']],
+                    desc,
+                    context=desc,
+                    method=action,
+                    parameters=result['_params_list'],
                     score=100,
                 )
                 
@@ -60,7 +97,7 @@ class CurrencyPP(Flox):
         # Always show the update status
         self.add_item(
             'Update Currency',
-            'Last updated at ' + self.broker.last_update.isoformat(),
+            'Last updated at ' + self.broker.last_update_iso,
             method=self.update_rates,
             parameters=[user_input],
             dont_hide=True
@@ -75,6 +112,13 @@ class CurrencyPP(Flox):
 
     def reload_settings(self):
         """Handle plugin settings changes from the Flow Launcher UI."""
+        # Flow Launcher also signals reloads when nothing was saved (e.g. on focus
+        # changes); an unchanged settings file means there is nothing to re-read
+        mtime = self._get_settings_mtime()
+        if self.broker and mtime is not None and mtime == self._settings_mtime:
+            self.logger.debug("Settings file unchanged, skipping reload")
+            return
+
         try:
             if self.broker:
                 # Save current state for change detection
@@ -85,7 +129,7 @@ class CurrencyPP(Flox):
             
             # Reload and apply new settings
             self.settings.reload()
-            self._read_config()
+            self._read_config(mtime)
             
             # Check for and handle currency changes
             if self.broker:
@@ -105,7 +149,7 @@ class CurrencyPP(Flox):
             try:
                 if hasattr(self, 'broker'):
                     delattr(self, 'broker')
-                self._read_config()
+                self._read_config(mtime)
             except Exception as e2:
                 self.logger.critical(f"Settings recovery failed: {e2}")
 
@@ -117,48 +161,34 @@ class CurrencyPP(Flox):
                         query['sources'][0]['currency'] is not None)
         return entered_dest or entered_source
 
-    def _parse_and_merge_input(self, user_input=None, empty=False):
+    def _parse_and_merge_input(self, user_input=None):
         """Parse user input and merge with default currency configuration.
         
         Args:
             user_input: Raw input string from the user
-            empty: If True, creates a query template without values
             
         Returns:
-            dict: Parsed query with source and destination currencies
+            tuple: Parsed query with source and destination currencies (None if
+                the input could not be parsed), and whether it is a direct request
         """
-        try:
-            default_cur_in = self.broker.default_cur_in
-            default_curs_out = self.broker.default_curs_out
-            
-            base_query = {
-                'sources': None if empty else [{'currency': default_cur_in, 'amount': 1.0}],
-                'destinations': None if empty else [{'currency': cur} for cur in default_curs_out],
-                'extra': None
-            }
-        except Exception as e:
-            self.logger.error(f"Error creating base query: {e}")
-            base_query = {
-                'sources': None if empty else [{'currency': 'USD', 'amount': 1.0}],
-                'destinations': None if empty else [{'currency': 'EUR'}],
-                'extra': None
-            }
-
         if not user_input or not user_input.strip():
-            return base_query
+            return None, False
 
         user_input = user_input.strip()
         
-        # Handle direct number input (e.g., "100")
-        try:
-            amount = float(user_input)
-            return {
-                'sources': [{'currency': self.broker.default_cur_in, 'amount': amount}],
-                'destinations': [{'currency': cur} for cur in self.broker.default_curs_out],
-                'extra': None
-            }
-        except ValueError:
-            pass  # Not a number, continue with full parsing
+        # Handle direct number input (e.g., "100"). The character check keeps
+        # ordinary queries from raising and catching a ValueError per keystroke
+        if user_input[0] in _NUMBER_START_CHARS and all(c in _NUMBER_CHARS for c in user_input):
+            try:
+                amount = float(user_input.replace(',', '.'))
+                query = {
+                    'sources': [{'currency': self._default_sources[0]['currency'], 'amount': amount}],
+                    'destinations': list(self._default_destinations),
+                    'extra': None
+                }
+                return query, True
+            except ValueError:
+                pass  # Not a number, continue with full parsing
 
         # Parse and validate full query
         try:
@@ -166,20 +196,41 @@ class CurrencyPP(Flox):
             
             # Apply default currencies if not specified
             if not parsed.get('destinations'):
-                parsed['destinations'] = [{'currency': cur} for cur in self.broker.default_curs_out]
+                parsed['destinations'] = list(self._default_destinations)
             if not parsed.get('sources'):
-                parsed['sources'] = [{'currency': self.broker.default_cur_in, 'amount': 1.0}]
+                parsed['sources'] = list(self._default_sources)
             
-            return parsed
+            return parsed, self._is_direct_request(parsed)
             
         except ParseError:
-            return base_query
+            return None, False
+
+    def _update_default_query(self, cur_in, curs_out):
+        """Rebuild the default sources/destinations from the configured currencies."""
+        self._default_sources = ({'currency': cur_in, 'amount': 1.0},)
+        self._default_destinations = tuple({'currency': cur} for cur in curs_out)
+
+    def _get_settings_mtime(self):
+        """Return the settings file's modification time, or None if it cannot be read."""
+        try:
+            return os.stat(self.settings_path).st_mtime
+        except OSError:
+            return None
+
+    def _get_str(self, key, default):
+        """Read a setting as a stripped string, using default if it is missing, not a string or blank."""
+        value = self.settings.get(key, default)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+        return default
 
-    def _read_config(self):
+    def _read_config(self, settings_mtime):
         """Load configuration from settings.json and initialize the plugin.
         This method is called during __init__ and by reload_settings() when settings change.
         Uses defensive programming to prevent crashes from malformed settings.
         This method is idempotent - it can be safely called multiple times to reload settings.
+        settings_mtime is the settings file's mtime, taken by the caller before the
+        settings were (re)loaded, so a save made while reading triggers another reload.
         
         CRITICAL: This method has been refactored to fix a runtime state corruption bug.
         The bug was caused by re-instantiating the ExchangeRates broker during settings reload,
@@ -193,28 +244,32 @@ class CurrencyPP(Flox):
             except:
                 pass  # Prevent logging errors from crashing the plugin
 
+        # Nothing to apply if the raw settings match the last completed read. The
+        # whole settings dict is copied, so settings read below never need to
+        # be registered anywhere for changes to them to be picked up
+        config_snapshot = dict(self.settings)
+        if self.broker is not None and config_snapshot == self._config_snapshot:
+            self.logger.debug("Configuration unchanged, skipping re-read")
+            # settings_mtime predates the settings reload, so a save racing
+            # with it still shows up as a changed file on the next reload
+            self._settings_mtime = settings_mtime
+            return
+
         try:
             # Read update frequency with safe fallback
-            update_freq_str = self.settings.get('update_freq', 'daily')
-            if not update_freq_str or not isinstance(update_freq_str, str):
-                update_freq_str = 'daily'
-            self.update_freq = UpdateFreq(update_freq_str)
-        except:
+            self.update_freq = UpdateFreq(self._get_str('update_freq', 'daily'))
+        except ValueError:
             self.update_freq = UpdateFreq('daily')
 
-        try:
-            # Read API key with safe fallback
-            app_id_key = self.settings.get('app_id', '')
-            if not isinstance(app_id_key, str):
-                app_id_key = ''
-            app_id_key = app_id_key.strip()
-        except:
-            app_id_key = ''
+        # Read API key with safe fallback
+        app_id_key = self._get_str('app_id', '')
 
         # Initialize or update the broker
         try:
-            # Ensure cache directory exists
-            cache_dir = cache_path(self.name)
+            # Ensure cache directory exists. This is the same path as
+            # flox.utils.cache_path(), but importing flox.utils would load
+            # urllib.request (and the HTTP stack) on every launch.
+            cache_dir = Path(gettempdir(), self.name)
             cache_dir.mkdir(exist_ok=True)
             
             # Track if this is first initialization
@@ -247,8 +302,7 @@ class CurrencyPP(Flox):
                     self.broker.expensive_service.app_id = app_id_key
                     changes.append("API key")
                 
-                # 3. Reset broker state
-                self.broker.clear_aliases()
+                # 3. Clear any previous webservice error
                 self.broker.error = None
                 
                 # 4. Force immediate update if config changed
@@ -260,31 +314,30 @@ class CurrencyPP(Flox):
             self.logger.error("Failed to initialize ExchangeRates broker: {}".format(e))
             return
 
+        broker = self.broker
+
         # --- Read and set input currency from user settings ---
         # This section runs for both new brokers and existing brokers during live reload
         try:
             # Get input currency from settings
-            current_input = getattr(self.broker, 'default_cur_in', None)
+            current_input = getattr(broker, 'default_cur_in', None)
             self.logger.debug(f"Current input currency before update: {current_input}")
             
-            input_code = self.settings.get('input_cur', 'USD' if is_first_init else current_input)
-            if not isinstance(input_code, str) or not input_code.strip():
-                input_code = 'USD' if is_first_init else current_input
-            input_code = input_code.strip()
+            input_code = self._get_str('input_cur', 'USD' if is_first_init else current_input)
             
             self.logger.debug(f"New input currency from settings: {input_code}")
             
             if is_first_init:
                 # First run - try to set the currency, fall back to USD if needed
-                success = self.broker.set_default_cur_in(input_code)
+                success = broker.set_default_cur_in(input_code)
                 if not success:
                     self.logger.warning(f"Failed to set initial input currency: {input_code}")
-                    self.broker.set_default_cur_in('USD')
+                    broker.set_default_cur_in('USD')
             else:
                 # During reload, only update if the setting actually changed
                 if current_input and input_code != current_input:
                     self.logger.info(f"Updating input currency from '{current_input}' to '{input_code}'")
-                    success = self.broker.set_default_cur_in(input_code)
+                    success = broker.set_default_cur_in(input_code)
                     if not success:
                         self.logger.warning(f"Failed to update input currency to: {input_code}")
                         self.logger.info(f"Keeping existing input currency: {current_input}")
@@ -293,10 +346,13 @@ class CurrencyPP(Flox):
         except Exception as e:
             if is_first_init:
                 self.logger.warning("Error setting input currency, using USD: {}".format(e))
-                self.broker.set_default_cur_in('USD')
+                broker.set_default_cur_in('USD')
             else:
                 self.logger.error("Error updating input currency: {}".format(e))
 
+        # Read the outcome once; everything below reuses these locals
+        cur_in = getattr(broker, 'default_cur_in', None) or 'USD'
+
         # --- Handle Output Currencies ---
         # FINAL RUNTIME STATE CORRUPTION FIX:
         # The root cause was that this fallback logic would overwrite user settings during runtime
@@ -308,43 +364,38 @@ class CurrencyPP(Flox):
         ULTIMATE_FALLBACK_CUR = 'USD EUR'  # A minimal, safe fallback for bootstrap only
 
         try:
-            # 2. Get the user's setting from settings.json, falling back to our default if it's missing.
-            output_code = self.settings.get('output_cur', DEFAULT_OUTPUT_CUR)
-
-            # 3. Sanitize the value. If it's not a string or is empty after stripping, use the default.
-            if not isinstance(output_code, str) or not output_code.strip():
-                output_code = DEFAULT_OUTPUT_CUR
-            else:
-                output_code = output_code.strip()
+            # 2. Get the user's setting from settings.json, falling back to our default
+            #    if it's missing, not a string or empty after stripping.
+            output_code = self._get_str('output_cur', DEFAULT_OUTPUT_CUR)
 
-            # 4. Handle output currencies differently for first run vs. reload
-            current_currencies = getattr(self.broker, 'default_curs_out', None)
+            # 3. Handle output currencies differently for first run vs. reload
+            current_currencies = getattr(broker, 'default_curs_out', None)
             self.logger.debug(f"Current output currencies before update: {current_currencies}")
             self.logger.debug(f"New output currencies from settings: {output_code}")
             
             if is_first_init:
                 # On first run, try user setting, then default, then fallback
-                success = self.broker.set_default_curs_out(output_code)
+                success = broker.set_default_curs_out(output_code)
                 if not success:
                     self.logger.warning(f"Failed to set initial output currencies: {output_code}")
-                    if not self.broker.set_default_curs_out(DEFAULT_OUTPUT_CUR):
+                    if not broker.set_default_curs_out(DEFAULT_OUTPUT_CUR):
                         self.logger.warning(f"Failed to set default output currencies: {DEFAULT_OUTPUT_CUR}")
-                        self.broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
+                        broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
             else:
                 # During runtime/reload, ONLY update if the setting actually changed
                 if current_currencies is None:
                     # Something's wrong, broker lost its state
                     self.logger.error("Broker lost currency state during reload")
-                    success = self.broker.set_default_curs_out(output_code)
+                    success = broker.set_default_curs_out(output_code)
                     if not success:
-                        self.broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
+                        broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
                 else:
                     # Convert current_currencies to space-separated string for comparison
                     current_str = ' '.join(current_currencies)
                     if current_str != output_code:
                         # Only try to update if the setting actually changed
                         self.logger.info(f"Updating output currencies from '{current_str}' to '{output_code}'")
-                        success = self.broker.set_default_curs_out(output_code)
+                        success = broker.set_default_curs_out(output_code)
                         if success:
                             self.logger.info("Successfully updated output currencies")
                         else:
@@ -354,141 +405,111 @@ class CurrencyPP(Flox):
                         self.logger.debug("Output currencies unchanged, skipping update")
 
         except Exception as e:
-            # 6. If any other unexpected error occurs, preserve existing settings during runtime
-            existing_currencies = getattr(self.broker, 'default_curs_out', None)
+            # 4. If any other unexpected error occurs, preserve existing settings during runtime
+            existing_currencies = getattr(broker, 'default_curs_out', None)
             if not existing_currencies or existing_currencies == ['USD', 'EUR', 'JPY']:
                 # First-run bootstrap: use safe fallback
                 self.logger.error("Error processing output currencies during bootstrap: {}. "
                                   "Using safe default '{}'.".format(e, ULTIMATE_FALLBACK_CUR))
-                self.broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
+                broker.set_default_curs_out(ULTIMATE_FALLBACK_CUR)
             else:
                 # Runtime: preserve existing user settings
                 self.logger.error("Error processing output currencies during runtime: {}. "
                                   "Preserving existing settings: {}.".format(e, existing_currencies))
 
+        curs_out = getattr(broker, 'default_curs_out', None) or ['USD', 'EUR']
+
         # Read separators from settings with safe fallbacks
-        try:
-            separators_string = self.settings.get('separators', 'to in :')
-            if not isinstance(separators_string, str):
-                separators_string = 'to in :'
-            separators_string = separators_string.strip()
-            separators = separators_string.split() if separators_string else ['to', 'in', ':']
-            if not separators:
-                separators = ['to', 'in', ':']
-        except:
-            separators = ['to', 'in', ':']
+        separators = self._get_str('separators', 'to in :').split()
 
         # Read destination separators from settings with safe fallbacks
-        try:
-            dest_seps_string = self.settings.get('destination_separators', 'and & ,')
-            if not isinstance(dest_seps_string, str):
-                dest_seps_string = 'and & ,'
-            dest_seps_string = dest_seps_string.strip()
-            dest_separators = dest_seps_string.split() if dest_seps_string else ['and', '&', ',']
-            if not dest_separators:
-                dest_separators = ['and', '&', ',']
-        except:
-            dest_separators = ['and', '&', ',']
+        dest_separators = self._get_str('destination_separators', 'and & ,').split()
 
         # Read and process aliases from settings with comprehensive error handling
-        # Clear all existing aliases to ensure clean state on reload
+        # The new alias table is built locally and replaces the old one in a
+        # single call, which keeps reloads idempotent
+        new_aliases = {}
         try:
-            self.broker.clear_aliases()  # This ensures idempotent behavior
             aliases_string = self.settings.get('aliases', 'EUR = euro euros\nusd = dollar dollars $ bucks')
             
             if aliases_string and isinstance(aliases_string, str):
-                for line in aliases_string.splitlines():
-                    try:
-                        line = line.strip()
-                        if not line or '=' not in line:
-                            continue
-                        
-                        parts = line.split('=', 1)
-                        if len(parts) != 2:
-                            continue
-                            
-                        key = parts[0].strip()
-                        aliases_part = parts[1].strip()
-                        
-                        if not key or not aliases_part:
-                            continue
-
-                        # Validate the currency key
-                        try:
-                            validated_key = self.broker.validate_code(key)
-                            if validated_key:
-                                aliases = aliases_part.split()
-                                for alias in aliases:
-                                    if alias:  # Skip empty aliases
-                                        try:
-                                            validated_alias = self.broker.validate_alias(alias)
-                                            if validated_alias:
-                                                self.broker.add_alias(validated_alias, validated_key)
-                                        except:
-                                            continue  # Skip invalid aliases silently
-                        except:
-                            continue  # Skip invalid currency keys silently
-                    except Exception:
-                        continue  # Skip malformed lines silently
+                # Split every "CODE = alias alias ..." line in one pass and
+                # validate all currency keys at once
+                matches = [(key.strip(), aliases_part.strip())
+                           for key, aliases_part in _ALIAS_LINE.findall(
+                               '\n'.join(aliases_string.splitlines()))]
+                valid_keys = broker.validate_codes_bulk([key for key, _ in matches])
+
+                for (key, aliases_part), validated_key in zip(matches, valid_keys):
+                    # Keys may also name an alias defined on an earlier line
+                    if validated_key is None and key.upper() in new_aliases:
+                        validated_key = key.upper()
+                    if not validated_key or not aliases_part:
+                        continue  # Skip malformed lines and invalid currency keys silently
+
+                    for alias in aliases_part.split():
+                        validated_alias = broker.validate_alias(alias, new_aliases)
+                        if validated_alias:
+                            new_aliases[validated_alias] = validated_key
         except Exception as e:
             self.logger.warning("Error processing aliases: {}".format(e))
+        broker.replace_aliases(new_aliases)
+
+        self._update_default_query(cur_in, curs_out)
 
         # CRITICAL: Parser initialization must ALWAYS succeed for plugin to work
-        # If it fails, we keep retrying with increasingly minimal configurations
-        parser_initialized = False
-        
-        # Attempt 1: Full configuration
+        # Invalid fields are caught up front and fall back to their defaults, so
+        # the parser is normally built exactly once
+        properties = ParserProperties()
+        properties.default_cur_in = cur_in
+        properties.default_curs_out = curs_out
+        properties.to_keywords = separators
+        properties.sep_keywords = dest_separators
+        properties.aliases = new_aliases
+
+        invalid_fields = properties.validate()
+        if invalid_fields:
+            self.logger.warning("Invalid parser configuration ({}), using defaults for those fields"
+                                .format(', '.join(invalid_fields)))
+            for field in invalid_fields:
+                delattr(properties, field)
+
         try:
-            properties = ParserProperties()
-            properties.default_cur_in = getattr(self.broker, 'default_cur_in', 'USD')
-            properties.default_curs_out = getattr(self.broker, 'default_curs_out', ['USD', 'EUR'])
-            properties.to_keywords = separators
-            properties.sep_keywords = dest_separators
-            properties.aliases = getattr(self.broker, 'aliases', {})
-            
-            self.parser = make_parser(properties)
-            parser_initialized = True
+            # Parsers are cached per configuration, so a reload that leaves these
+            # untouched reuses the previous parser instead of rebuilding it
+            self.parser = _build_parser(
+                properties.default_cur_in,
+                tuple(properties.default_curs_out),
+                tuple(properties.to_keywords),
+                tuple(properties.sep_keywords),
+                frozenset(properties.aliases.items()))
             self.logger.info("Parser initialized successfully with full configuration")
             
         except Exception as e:
             self.logger.error("Full parser initialization failed: {}".format(e))
             
-            # Attempt 2: Minimal configuration with current currencies
+            # Final Attempt: Absolute minimal fallback
             try:
-                minimal_props = ParserProperties()
-                minimal_props.default_cur_in = getattr(self.broker, 'default_cur_in', 'USD')
-                minimal_props.default_curs_out = getattr(self.broker, 'default_curs_out', ['USD', 'EUR'])
+                self.parser = make_parser(ParserProperties())
+                self.logger.warning("Parser initialized with ultimate fallback configuration")
                 
-                self.parser = make_parser(minimal_props)
-                parser_initialized = True
-                self.logger.warning("Parser initialized with minimal configuration (currencies only)")
-                
-            except Exception as e2:
-                self.logger.error("Minimal parser initialization failed: {}".format(e2))
-                
-                # Final Attempt: Absolute minimal fallback
-                try:
-                    ultimate_props = ParserProperties()
-                    self.parser = make_parser(ultimate_props)
-                    parser_initialized = True
-                    self.logger.warning("Parser initialized with ultimate fallback configuration")
-                    
-                except Exception as e3:
-                    self.logger.critical("All parser initialization attempts failed")
-                    self.parser = None
-        
-        if not parser_initialized:
-            self.logger.critical("Parser initialization completely failed - plugin may not function correctly")
-            # Even here, we don't return - let the plugin try to continue
+            except Exception:
+                self.logger.critical("Parser initialization completely failed - plugin may not function correctly")
+                # Even here, we don't return - let the plugin try to continue
+                self.parser = None
         
+        # Only remember this read if it could be applied: without rates the
+        # currencies and alias keys all fail validation, and the next reload
+        # has to apply them again once the rates are in
+        if broker.currencies:
+            self._settings_mtime = settings_mtime
+            self._config_snapshot = config_snapshot
+
         # Log the final configuration for debugging (with safe string formatting)
         try:
-            input_cur = getattr(self.broker, 'default_cur_in', 'USD')
-            output_curs = getattr(self.broker, 'default_curs_out', ['USD'])
-            alias_count = len(getattr(self.broker, 'aliases', {}))
-            self.logger.info("Plugin configured with input currency: {}".format(input_cur))
-            self.logger.info("Plugin configured with output currencies: {}".format(output_curs))
-            self.logger.info("Plugin configured with {} aliases".format(alias_count))
+            self.logger.info("Plugin configured with input currency: {}".format(cur_in))
+            self.logger.info("Plugin configured with output currencies: {}".format(curs_out))
+            self.logger.info("Plugin configured with {} aliases".format(len(new_aliases)))
         except:
             self.logger.info("Plugin configuration completed")
 
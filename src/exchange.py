@@ -24,7 +24,8 @@ class UpdateFreq(Enum):
 class ExchangeRates():
 
     _file_path = None
-    last_update = None
+    _last_update = None
+    last_update_iso = None
     update_freq = None
     _currencies = {}
     _aliases = {}
@@ -43,6 +44,7 @@ class ExchangeRates():
         self.expensive_service = OpenExchangeRates(self.plugin, app_id)
         self.update_freq = update_freq
         self._file_path = os.path.join(path, 'rates.json')
+        self._result_buffer = []
 
         if os.path.exists(self._file_path):
             try:
@@ -54,6 +56,16 @@ class ExchangeRates():
 
         self.tryUpdate()
 
+    @property
+    def last_update(self):
+        return self._last_update
+
+    @last_update.setter
+    def last_update(self, value):
+        # Cache the display string so queries don't format it on every keystroke
+        self._last_update = value
+        self.last_update_iso = value.isoformat() if value is not None else None
+
     def shouldUpdate(self):
         time_diff = datetime.now() - self.last_update
         if self.update_freq.value == UpdateFreq.HOURLY.value:
@@ -150,26 +162,32 @@ class ExchangeRates():
         lst = [x.strip() for x in codeString.split(',')]
         return lst
 
-    def clear_aliases(self):
-        self._aliases.clear()
+    @property
+    def currencies(self):
+        return self._currencies.keys()
+
+    @property
+    def aliases(self):
+        return self._aliases
+
+    def replace_aliases(self, aliases):
+        self._aliases = aliases
 
-    def validate_alias(self, alias):
+    def validate_alias(self, alias, aliases=None):
+        if aliases is None:
+            aliases = self._aliases
         validated = alias.upper()
         if len(validated) < 1:
             return None
         elif validated in self._currencies:
             return None
-        elif validated in self._aliases:
+        elif validated in aliases:
             return None
         elif re.search(r'\d', validated):
             return None
         else:
             return validated
 
-    def add_alias(self, alias, forCurrency):
-        validatedCurrency = self.validate_code(forCurrency)
-        self._aliases[alias] = validatedCurrency
-
     def validate_code(self, codeString, raiseOnNone=False):
         if codeString is None:
             if raiseOnNone:
@@ -180,41 +198,63 @@ class ExchangeRates():
         else:
             raise CurrencyError(codeString)
 
+    def validate_codes_bulk(self, codeStrings):
+        """Validate several currency codes at once; aliases and unknown codes map to None."""
+        currencies = self._currencies
+        return [code.upper() if code.upper() in currencies else None for code in codeStrings]
+
     def format_number(self, number, fullDigits=False):
         if fullDigits:
-            formatted = '{:,.8f}'.format(number).rstrip('0').rstrip('.')
+            formatted = format(number, ',.8f').rstrip('0').rstrip('.')
         else:
-            formatted = '{:,.2f}'.format(number).rstrip('.')
+            formatted = format(number, ',.2f').rstrip('.')
         return formatted
 
+    def _result_slot(self, index):
+        # Result dicts (and their one-item parameter lists) are reused across
+        # queries; convert() overwrites every field before handing them out
+        if index == len(self._result_buffer):
+            self._result_buffer.append({
+                'amount': None,
+                'description': None,
+                'title': None,
+                '_params_list': [None]
+            })
+        return self._result_buffer[index]
+
     def convert(self, query):
-        results = []
+        # The sources are the same for every destination, so resolve their
+        # rates and build their description once up front
+        sources = []
+        srcDescription = ''
+        for index, source in enumerate(query['sources']):
+            sourceCode = self.validate_code(source['currency'])
+            amount = source['amount'] if source['amount'] else 1
+            sources.append((self.rate(sourceCode), amount))
+            if amount < 0 or index > 0:
+                srcDescription += ' - ' if amount < 0 else ' + '
+            srcDescription += '{} {}'.format(self.format_number(abs(amount)),
+                                             self.name(sourceCode))
+
+        fullDigits = len(query['sources']) == 1 and \
+            (query['sources'][0]['amount'] or 1) == 1
+
+        count = 0
         for destination in query['destinations']:
             destinationCode = self.validate_code(destination['currency'], True)
+            destinationRate = self.rate(destinationCode)
             total = 0
-            srcDescription = ''
-            for index, source in enumerate(query['sources']):
-                sourceCode = self.validate_code(source['currency'])
-                rate = self.rate(destinationCode) / self.rate(sourceCode)
-                amount = source['amount'] if source['amount'] else 1
-                convertedAmount = rate * amount
-                total += convertedAmount
-                if amount < 0 or index > 0:
-                    srcDescription += ' - ' if amount < 0 else ' + '
-                srcDescription += '{} {}'.format(self.format_number(abs(amount)),
-                                                 self.name(sourceCode))
-
-            fullDigits = len(query['sources']) == 1 and \
-                (query['sources'][0]['amount'] or 1) == 1
+            for sourceRate, amount in sources:
+                total += destinationRate / sourceRate * amount
 
             formatted_total = self.format_number(total, fullDigits)
-            result = {
-                'amount': total,
-                'description': srcDescription,
-                'title': '{}'.format(formatted_total + ' ' + self.name(destinationCode))
-            }
-            results.append(result)
-        return results
+            result = self._result_slot(count)
+            result['amount'] = total
+            result['_params_list'][0] = total
+            result['description'] = srcDescription
+            result['title'] = formatted_total + ' ' + self.name(destinationCode)
+            count += 1
+        return self._result_buffer[:count]
 
     def set_default_cur_in(self, string):
         code = string.upper()
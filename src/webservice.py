@@ -1,7 +1,9 @@
-import urllib
-import urllib.request as request
+import urllib.parse
 import json
 
+# urllib.request pulls in the whole HTTP/SSL/email stack, which is only needed
+# when rates are actually fetched, so it is imported inside load_from_url().
+
 
 class PrivateDomain():
 
@@ -14,6 +16,8 @@ class PrivateDomain():
         return self.url
 
     def load_from_url(self):
+        from urllib import request
+
         self.plugin.logger.info("loading from cache server...")
         opener = request.build_opener()
         opener.addheaders = [("User-agent", "Mozilla/5.0")]
@@ -49,6 +53,8 @@ class OpenExchangeRates():
         return self.url + '?' + urllib.parse.urlencode(parameters)
 
     def load_from_url(self):
+        from urllib import request
+
         self.plugin.logger.info("loading from API...")
         opener = request.build_opener()
 